@@ -1,86 +1,197 @@
 #!/usr/bin/env python3
 """
-Flask API server for OCR processing
+Quart (ASGI) API server for OCR processing
 Integrates with existing ocr_to_md.py functionality
 """
 
-import os
-import tempfile
+import asyncio
+import io
 import uuid
-from pathlib import Path
-from flask import Flask, request, jsonify, send_file
-from flask_cors import CORS
-from werkzeug.utils import secure_filename
+from collections import OrderedDict
+import orjson
+from quart import Quart, Request, request, jsonify
+from quart.json.provider import JSONProvider
+from quart_cors import cors
 import logging
 
 # Import our existing OCR functions
-from scripts.ocr_to_md import ocr_to_markdown, llm_to_markdown
+from scripts.ocr_to_md import (
+    ocr_to_markdown_async, ocr_to_markdown_gpu_async, llm_to_markdown, llm_to_markdown_batch,
+    start_ocr_pool, start_gpu_ocr, shutdown_ocr_pool, content_hasher, close_http_client
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Flask app
-app = Flask(__name__)
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, used by jsonify() and request.get_json()"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand the encoded bytes straight to the response, skipping the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+def memory_stream_factory(total_content_length, content_type, filename, content_length=None):
+    """Keep uploaded file parts in memory (bounded by MAX_CONTENT_LENGTH) instead of spooling large ones to disk"""
+    return io.BytesIO()
+
+class InMemoryUploadRequest(Request):
+    """Request whose multipart file parts are never written to a temporary file"""
+
+    def make_form_data_parser(self):
+        parser = super().make_form_data_parser()
+        parser.stream_factory = memory_stream_factory
+        return parser
+
+# Initialize Quart app (Flask-compatible API, served over ASGI)
+app = Quart(__name__)
+app.json = ORJSONProvider(app)
+app.request_class = InMemoryUploadRequest
 
 # Enable CORS for all domains (configure more restrictively in production)
-CORS(app, origins=['http://localhost:3000', 'http://localhost:5173'])
+app = cors(app, allow_origin=['http://localhost:3000', 'http://localhost:5173'])
 
 # Configuration
-UPLOAD_FOLDER = tempfile.mkdtemp()
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff', 'pdf'}
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB max file size
+UPLOAD_STORE_SIZE = 256 * 1024 * 1024  # 256MB of pending uploads per worker
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
+AVAILABLE_LANGUAGES = [
+    {'code': 'eng', 'name': 'English'},
+    {'code': 'hrv', 'name': 'Croatian'},
+    {'code': 'fra', 'name': 'French'},
+    {'code': 'deu', 'name': 'German'},
+    {'code': 'spa', 'name': 'Spanish'},
+    {'code': 'ita', 'name': 'Italian'},
+    {'code': 'eng+hrv', 'name': 'English + Croatian'}
+]
+
+class UploadStore:
+    """In-process LRU of uploaded (bytes, digest) pairs awaiting processing, capped by total size"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._files = OrderedDict()
+
+    def __contains__(self, file_id):
+        return file_id in self._files
+
+    def add(self, data, digest):
+        """Store upload bytes and return their new file_id, evicting the oldest uploads if full"""
+        file_id = uuid.uuid4().hex
+        self._files[file_id] = (data, digest)
+        self.size += len(data)
+        while self.size > self.max_bytes and len(self._files) > 1:
+            _, (evicted, _) = self._files.popitem(last=False)
+            self.size -= len(evicted)
+        return file_id
+
+    def pop(self, file_id):
+        """Remove and return (bytes, digest) for file_id, or None if unknown or evicted"""
+        upload = self._files.pop(file_id, None)
+        if upload is not None:
+            self.size -= len(upload[0])
+        return upload
+
+uploads = UploadStore(UPLOAD_STORE_SIZE)
+
+@app.before_serving
+async def warm_ocr():
+    """Start the OCR worker processes, each loading every available language, before accepting requests"""
+    await start_ocr_pool([lang['code'] for lang in AVAILABLE_LANGUAGES])
+    if await start_gpu_ocr():
+        logger.info("GPU OCR models loaded")
+
+@app.after_serving
+async def stop_ocr():
+    """Stop the OCR worker processes and close pooled LLM connections"""
+    shutdown_ocr_pool()
+    await close_http_client()
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def cleanup_file(filepath):
-    """Clean up uploaded file"""
-    try:
-        if os.path.exists(filepath):
-            os.remove(filepath)
-    except Exception as e:
-        logger.warning(f"Failed to cleanup file {filepath}: {e}")
+def read_upload(file):
+    """Read an uploaded file into memory, computing its content digest in the same pass"""
+    hasher = content_hasher()
+    buf = io.BytesIO()
+    while chunk := file.stream.read(UPLOAD_CHUNK_SIZE):
+        hasher.update(chunk)
+        buf.write(chunk)
+    return buf.getvalue(), hasher.hexdigest()
+
+async def extract_markdown(image, digest, method, language):
+    """Run the requested method on raw image bytes"""
+    if method == 'llm':
+        return await llm_to_markdown(image, language, digest)
+    if method == 'gpu':
+        return (await ocr_to_markdown_gpu_async([image], language, [digest]))[0]
+    return await ocr_to_markdown_async(image, language, digest)
+
+def build_result(markdown_content, method, language, file_id):
+    """Shape processed markdown into the structured data returned to the frontend"""
+    # Parse the markdown content into structured data for frontend
+    # This is a simple parser - can be enhanced based on needs
+    lines = [line for line in map(str.strip, markdown_content.splitlines()) if line]
+    
+    # Extract basic information (this can be enhanced with better parsing)
+    return {
+        'raw_text': markdown_content,
+        'lines': lines,
+        'method_used': method,
+        'language': language,
+        'file_id': file_id
+    }
+
+async def get_uploaded_file():
+    """Return the 'file' part of a multipart request, or an error response tuple"""
+    files = await request.files
+    if 'file' not in files:
+        return None, (jsonify({'error': 'No file provided'}), 400)
+    
+    file = files['file']
+    if not file or not file.filename or file.filename == '':
+        return None, (jsonify({'error': 'No file selected'}), 400)
+    
+    if not allowed_file(file.filename):
+        return None, (jsonify({'error': 'File type not supported'}), 400)
+    
+    return file, None
 
 @app.route('/health', methods=['GET'])
-def health_check():
+async def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'service': 'llm-ocr-api'})
 
 @app.route('/api/upload', methods=['POST'])
-def upload_file():
+async def upload_file():
     """Handle file upload and return file info"""
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file provided'}), 400
+        file, error = await get_uploaded_file()
+        if error:
+            return error
         
-        file = request.files['file']
-        if not file or not file.filename or file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'File type not supported'}), 400
-        
-        # Generate unique filename
-        filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4()}_{filename}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-        
-        # Save file
-        file.save(filepath)
-        
-        # Get file info
-        file_size = os.path.getsize(filepath)
+        # Keep the bytes in memory until /api/process picks them up
+        data, digest = read_upload(file)
+        file_id = uploads.add(data, digest)
         
         return jsonify({
-            'file_id': unique_filename,
-            'original_name': filename,
-            'size': file_size,
+            'file_id': file_id,
+            'original_name': file.filename,
+            'size': len(data),
             'status': 'uploaded'
         })
     
@@ -88,68 +199,140 @@ def upload_file():
         logger.error(f"Upload error: {e}")
         return jsonify({'error': 'Upload failed'}), 500
 
+@app.route('/api/ocr', methods=['POST'])
+async def upload_and_process():
+    """Upload and process a file in one request, without storing it"""
+    try:
+        file, error = await get_uploaded_file()
+        if error:
+            return error
+        
+        form = await request.form
+        method = form.get('method', 'ocr')  # 'ocr', 'llm' or 'gpu'
+        language = form.get('language', 'eng')
+        
+        try:
+            logger.info(f"Processing {file.filename} with {method.upper()} method")
+            markdown_content = await extract_markdown(*read_upload(file), method, language)
+            
+            return jsonify({
+                'status': 'success',
+                'data': build_result(markdown_content, method, language, None)
+            })
+        
+        except Exception as processing_error:
+            logger.error(f"Processing error: {processing_error}")
+            return jsonify({'error': f'Processing failed: {str(processing_error)}'}), 500
+    
+    except Exception as e:
+        logger.error(f"OCR request error: {e}")
+        return jsonify({'error': 'Processing request failed'}), 500
+
 @app.route('/api/process', methods=['POST'])
-def process_ocr():
+async def process_ocr():
     """Process uploaded file with OCR or LLM"""
     try:
-        data = request.get_json()
+        data = await request.get_json()
         
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
         file_id = data.get('file_id')
-        method = data.get('method', 'ocr')  # 'ocr' or 'llm'
+        method = data.get('method', 'ocr')  # 'ocr', 'llm' or 'gpu'
         language = data.get('language', 'eng')
         
         if not file_id:
             return jsonify({'error': 'No file_id provided'}), 400
         
-        # Find the uploaded file
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], file_id)
-        if not os.path.exists(filepath):
+        if not isinstance(file_id, str):
+            return jsonify({'error': 'file_id must be a string'}), 400
+        
+        # Uploads are processed once and then dropped
+        upload = uploads.pop(file_id)
+        if upload is None:
             return jsonify({'error': 'File not found'}), 404
         
         try:
-            # Process with appropriate method
-            if method == 'llm':
-                logger.info(f"Processing {file_id} with LLM method")
-                markdown_content = llm_to_markdown(Path(filepath), language)
-            else:
-                logger.info(f"Processing {file_id} with OCR method")
-                markdown_content = ocr_to_markdown(Path(filepath), language)
-            
-            # Parse the markdown content into structured data for frontend
-            # This is a simple parser - can be enhanced based on needs
-            lines = [line.strip() for line in markdown_content.split('\n') if line.strip()]
-            
-            # Extract basic information (this can be enhanced with better parsing)
-            extracted_data = {
-                'raw_text': markdown_content,
-                'lines': lines,
-                'method_used': method,
-                'language': language,
-                'file_id': file_id
-            }
+            logger.info(f"Processing {file_id} with {method.upper()} method")
+            markdown_content = await extract_markdown(*upload, method, language)
             
             return jsonify({
                 'status': 'success',
-                'data': extracted_data
+                'data': build_result(markdown_content, method, language, file_id)
             })
             
         except Exception as processing_error:
             logger.error(f"Processing error: {processing_error}")
             return jsonify({'error': f'Processing failed: {str(processing_error)}'}), 500
-            
-        finally:
-            # Clean up the uploaded file
-            cleanup_file(filepath)
     
     except Exception as e:
         logger.error(f"Process OCR error: {e}")
         return jsonify({'error': 'Processing request failed'}), 500
 
+@app.route('/api/process_batch', methods=['POST'])
+async def process_batch():
+    """Process several uploaded files (e.g. pages of one document) together
+
+    With the LLM method, pages are sent to the model in groups so each call
+    carries several images instead of one.
+    """
+    try:
+        data = await request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        file_ids = data.get('file_ids')
+        method = data.get('method', 'llm')  # 'llm', 'gpu' or 'ocr'
+        language = data.get('language', 'eng')
+        
+        if not file_ids or not isinstance(file_ids, list):
+            return jsonify({'error': 'No file_ids provided'}), 400
+        
+        # Validate every id before popping any, so a bad request doesn't drop uploads
+        if not all(isinstance(file_id, str) for file_id in file_ids):
+            return jsonify({'error': 'file_ids must be strings'}), 400
+        
+        if len(set(file_ids)) != len(file_ids):
+            return jsonify({'error': 'Duplicate file_ids provided'}), 400
+        
+        # Find the uploaded files
+        missing = [file_id for file_id in file_ids if file_id not in uploads]
+        if missing:
+            return jsonify({'error': f"File not found: {', '.join(missing)}"}), 404
+        images, digests = zip(*(uploads.pop(file_id) for file_id in file_ids))
+        
+        try:
+            if method == 'llm':
+                logger.info(f"Processing batch of {len(images)} files with LLM method")
+                contents = await llm_to_markdown_batch(list(images), language, list(digests))
+            elif method == 'gpu':
+                logger.info(f"Processing batch of {len(images)} files with GPU method")
+                contents = await ocr_to_markdown_gpu_async(list(images), language, list(digests))
+            else:
+                logger.info(f"Processing batch of {len(images)} files with OCR method")
+                contents = await asyncio.gather(*(
+                    ocr_to_markdown_async(image, language, digest) for image, digest in zip(images, digests)
+                ))
+            
+            return jsonify({
+                'status': 'success',
+                'data': [
+                    build_result(markdown_content, method, language, file_id)
+                    for markdown_content, file_id in zip(contents, file_ids)
+                ]
+            })
+        
+        except Exception as processing_error:
+            logger.error(f"Batch processing error: {processing_error}")
+            return jsonify({'error': f'Processing failed: {str(processing_error)}'}), 500
+    
+    except Exception as e:
+        logger.error(f"Process batch error: {e}")
+        return jsonify({'error': 'Processing request failed'}), 500
+
 @app.route('/api/download/<file_id>', methods=['GET'])
-def download_result(file_id):
+async def download_result(file_id):
     """Download processed markdown file"""
     try:
         # In a real implementation, you'd store the processed results
@@ -161,42 +344,32 @@ def download_result(file_id):
         return jsonify({'error': 'Download failed'}), 500
 
 @app.route('/api/languages', methods=['GET'])
-def get_available_languages():
+async def get_available_languages():
     """Get list of available OCR languages"""
-    return jsonify({
-        'languages': [
-            {'code': 'eng', 'name': 'English'},
-            {'code': 'hrv', 'name': 'Croatian'},
-            {'code': 'fra', 'name': 'French'},
-            {'code': 'deu', 'name': 'German'},
-            {'code': 'spa', 'name': 'Spanish'},
-            {'code': 'ita', 'name': 'Italian'},
-            {'code': 'eng+hrv', 'name': 'English + Croatian'}
-        ]
-    })
+    return jsonify({'languages': AVAILABLE_LANGUAGES})
 
 @app.errorhandler(413)
-def too_large(e):
+async def too_large(e):
     """Handle file too large error"""
     return jsonify({'error': 'File too large'}), 413
 
 @app.errorhandler(404)
-def not_found(e):
+async def not_found(e):
     """Handle not found error"""
     return jsonify({'error': 'Endpoint not found'}), 404
 
 @app.errorhandler(500)
-def internal_error(e):
+async def internal_error(e):
     """Handle internal server error"""
     return jsonify({'error': 'Internal server error'}), 500
 
 if __name__ == '__main__':
     print(f"Starting OCR API server...")
-    print(f"Upload folder: {UPLOAD_FOLDER}")
+    print(f"Upload store size: {UPLOAD_STORE_SIZE / (1024*1024):.1f}MB")
     print(f"Allowed file types: {ALLOWED_EXTENSIONS}")
     print(f"Max file size: {MAX_FILE_SIZE / (1024*1024):.1f}MB")
     
-    # Run in development mode
+    # Run in development mode (use hypercorn in production)
     app.run(
         host='0.0.0.0',
         port=8000,
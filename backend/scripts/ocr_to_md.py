@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
 import argparse
-import base64
+import asyncio
+import concurrent.futures
+import functools
+import io
+import multiprocessing
 import os
+import re
+import threading
+import uuid
 from pathlib import Path
 
 try:
@@ -10,28 +17,198 @@ except Exception as e:
     raise SystemExit("Pillow is required. Install with: pip install pillow")
 
 try:
-    import pytesseract
+    import tesserocr
 except Exception as e:
-    raise SystemExit("pytesseract is required. Install with: pip install pytesseract")
+    raise SystemExit("tesserocr is required. Install with: pip install tesserocr")
 
 try:
-    import requests
+    import orjson
 except Exception as e:
-    print("Warning: requests not available. LLM parsing will be disabled.")
-    requests = None
+    raise SystemExit("orjson is required. Install with: pip install orjson")
 
+try:
+    import httpx
+except Exception as e:
+    print("Warning: httpx not available. LLM parsing will be disabled.")
+    httpx = None
 
-def llm_to_markdown(image_path: Path, lang: str) -> str:
-    """Use Qwen2.5-VL-72B vision model via OpenRouter to parse image content to markdown with better accuracy than OCR."""
-    if not requests:
-        raise SystemExit("requests library required for LLM parsing. Install with: pip install requests")
-    
-    # Convert image to base64
-    with open(image_path, "rb") as image_file:
-        base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-    
-    # Determine language context
-    lang_context = {
+try:
+    import diskcache
+except Exception as e:
+    print("Warning: diskcache not available. Result caching will be disabled.")
+    diskcache = None
+
+try:
+    from blake3 import blake3 as _hasher
+except Exception:
+    from hashlib import sha256 as _hasher
+
+try:
+    import pybase64 as base64
+except Exception:
+    import base64
+
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+LLM_MODEL = "qwen/qwen-2-vl-72b-instruct"
+
+# Qwen2.5-VL's native tile ceiling; larger inputs only cost tokens and upload time
+LLM_MAX_IMAGE_SIDE = 1536
+LLM_JPEG_QUALITY = 85
+
+# Upper bound on images per batched LLM call, to stay well inside the model context
+LLM_BATCH_SIZE = 6
+
+# Three or more newlines, i.e. runs of more than one empty line
+BLANK_LINE_RUNS = re.compile(r"\n\n\n+")
+
+PAGE_DELIMITER = re.compile(r"^=== PAGE \d+ ===[ \t]*$", re.MULTILINE)
+
+# Serialized in place of each image URL, then replaced by the image's base64 bytes
+# when the request body is sent; random so no prompt text can contain it
+IMAGE_URL_MARKER = f"image-{uuid.uuid4().hex}"
+
+# Optional pool of API keys / mirror providers; see endpoints.example.json
+ENDPOINTS_FILE = Path(os.getenv("LLM_ENDPOINTS_FILE", Path(__file__).parent.parent / "endpoints.json"))
+MAX_CONCURRENT_PER_ENDPOINT = int(os.getenv("LLM_MAX_CONCURRENT_PER_ENDPOINT", "8"))
+LLM_MAX_ATTEMPTS = 5
+LLM_RETRY_BACKOFF = 0.5  # seconds, doubled after every failed attempt
+
+# Processes running Tesseract, so OCR scales across cores instead of contending for the GIL
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", os.cpu_count() or 1))
+
+# JPEGs larger than this are downscaled by libjpeg while decoding for OCR
+OCR_DRAFT_SIZE = (2000, 2000)
+
+# Pages whose longest side is below OCR_SMALL_SIDE are upscaled by OCR_UPSCALE before
+# OCR (as are CJK pages below OCR_LARGE_SIDE, whose glyphs need more pixels). Latin-script
+# pages whose levels already span OCR_CLEAN_SPREAD, and that are scanned at OCR_PRINT_DPI
+# or more when the image records its DPI, are clean print scans and skip autocontrast
+OCR_SMALL_SIDE = 1000
+OCR_LARGE_SIDE = 2000
+OCR_UPSCALE = 2
+OCR_CLEAN_SPREAD = 224
+OCR_PRINT_DPI = 300
+LATIN_LANGS = frozenset({"eng", "hrv", "fra", "deu", "spa", "ita"})
+CJK_LANGS = frozenset({"chi_sim", "chi_tra", "jpn", "kor", "chi_sim_vert", "chi_tra_vert", "jpn_vert", "kor_vert"})
+
+# Pages with fewer than BLANK_PAGE_MAX_DARK_PIXELS (auto-contrasted) pixels darker than
+# BLANK_PAGE_DARK_LEVEL skip OCR/LLM entirely. An absolute count rather than a share of
+# the page, so a single word (~1000 pixels at 12pt, 300 DPI) keeps a page, while specks
+# of dust don't
+BLANK_PAGE_DARK_LEVEL = 32
+BLANK_PAGE_MAX_DARK_PIXELS = 100
+
+# Tesseract language codes -> ISO 639-1 codes used by Surya for GPU OCR
+SURYA_LANGS = {"eng": "en", "hrv": "hr", "fra": "fr", "deu": "de", "spa": "es", "ita": "it"}
+
+CACHE_DIR = os.getenv("OCR_CACHE_DIR", "/var/cache/llm-ocr")
+
+# Bumped when a method's output for the same image changes, so results cached by an
+# older version aren't served
+CACHE_VERSIONS = {"ocr": 2}
+
+# None until first use, False if the cache could not be opened
+_result_cache = None
+
+
+def _get_result_cache():
+    """Return the on-disk markdown cache, or None if caching is unavailable."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = False
+        if diskcache:
+            try:
+                _result_cache = diskcache.Cache(CACHE_DIR)
+            except Exception as e:
+                print(f"Warning: Could not open result cache at {CACHE_DIR}: {e}. Caching disabled.")
+    return _result_cache if _result_cache is not False else None
+
+
+def content_hasher():
+    """Return a fresh hasher for computing content digests incrementally."""
+    return _hasher()
+
+
+def content_digest(image: Path | bytes) -> str:
+    """Hex digest of the raw bytes of an image file or buffer."""
+    h = _hasher()
+    if isinstance(image, bytes):
+        h.update(image)
+    else:
+        with open(image, "rb") as f:
+            while chunk := f.read(1 << 20):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_key(image: Path | bytes, digest: str | None, method: str, lang: str) -> str | None:
+    """Cache key for an image's result, or None when caching is unavailable.
+
+    ``digest`` is the image's content_digest when the caller already has it.
+    """
+    if _get_result_cache() is None:
+        return None
+    if method in CACHE_VERSIONS:
+        method = f"{method}.v{CACHE_VERSIONS[method]}"
+    return f"{method}:{lang}:{digest or content_digest(image)}"
+
+
+def _cache_get(key: str):
+    cache = _get_result_cache()
+    return cache.get(key) if cache is not None else None
+
+
+def _cache_set(key: str, md: str) -> None:
+    cache = _get_result_cache()
+    if cache is not None:
+        cache.set(key, md)
+
+
+# diskcache does blocking SQLite I/O, so coroutines reach it through a thread
+
+
+async def _cache_get_many(keys: list) -> list:
+    """Cached results for keys (None for a missing key or result), looked up off the event loop."""
+    if not any(keys):
+        return [None] * len(keys)
+    return await asyncio.to_thread(lambda: [_cache_get(key) if key else None for key in keys])
+
+
+async def _cache_set_many(keys: list, mds: list) -> None:
+    """Store results for every non-None key, off the event loop."""
+    if any(keys):
+        await asyncio.to_thread(lambda: [_cache_set(key, md) for key, md in zip(keys, mds) if key])
+
+
+# Shared across requests so in-flight LLM calls reuse pooled connections
+_http_client = None
+
+
+def _get_http_client():
+    """Return the module-level async HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            # Fail fast on unreachable endpoints so the retry can pick another one
+            timeout=httpx.Timeout(60, connect=10),
+            # Keep idle TLS connections around between bursts instead of re-handshaking
+            limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=120),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _lang_context(lang: str) -> str:
+    return {
         'hrv': 'Croatian',
         'eng': 'English', 
         'fra': 'French',
@@ -39,8 +216,15 @@ def llm_to_markdown(image_path: Path, lang: str) -> str:
         'spa': 'Spanish',
         'ita': 'Italian'
     }.get(lang, 'English')
-    
-    # Load API key - prioritize .env file over potentially stale environment variables
+
+
+@functools.cache
+def _load_api_key():
+    """Return the OpenRouter API key, or None if unset or a placeholder.
+
+    Resolved once per process; use endpoints.json to rotate keys without a restart.
+    """
+    # Prioritize .env file over potentially stale environment variables
     api_key = None
     
     # First try loading from .env file
@@ -66,101 +250,630 @@ def llm_to_markdown(image_path: Path, lang: str) -> str:
         if env_api_key and not env_api_key.startswith('your-') and env_api_key != 'your_api_key_here':
             api_key = env_api_key
     
-    if not api_key:
-        print("Warning: OPENROUTER_API_KEY not set or contains placeholder value. Falling back to OCR.")
-        print("To get an API key, visit: https://openrouter.ai/")
-        print("Set it in .env file as: OPENROUTER_API_KEY=sk-or-v1-your-actual-key")
-        return ocr_to_markdown(image_path, lang)
-    
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}",
-        "HTTP-Referer": "https://github.com/your-repo",  # Optional: for OpenRouter analytics
-        "X-Title": "OCR Document Parser"  # Optional: for OpenRouter analytics
+    return api_key
+
+
+class _Endpoint:
+    """One OpenAI-compatible chat completions API plus its in-flight request count."""
+
+    def __init__(self, name: str, url: str, api_key: str, model: str = LLM_MODEL,
+                 max_concurrent: int = MAX_CONCURRENT_PER_ENDPOINT):
+        self.name = name
+        self.url = url
+        self.model = model
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+            "HTTP-Referer": "https://github.com/your-repo",  # Optional: for OpenRouter analytics
+            "X-Title": "OCR Document Parser"  # Optional: for OpenRouter analytics
+        }
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+
+
+_endpoints = []
+_endpoints_mtime = None
+
+
+def _read_endpoints_file() -> list:
+    with open(ENDPOINTS_FILE, 'rb') as f:
+        config = orjson.loads(f.read())
+    return [
+        _Endpoint(
+            name,
+            entry['base_url'].rstrip('/') + "/chat/completions",
+            entry['api_key'],
+            entry.get('model', LLM_MODEL),
+            entry.get('max_concurrent', MAX_CONCURRENT_PER_ENDPOINT),
+        )
+        for name, entry in config.items()
+    ]
+
+
+def _get_endpoints() -> list:
+    """Return the LLM endpoint pool, reloading endpoints.json whenever it changes.
+
+    Without an endpoints file the pool is the single OpenRouter key from
+    .env / OPENROUTER_API_KEY, or empty if no usable key is configured.
+    """
+    global _endpoints, _endpoints_mtime
+    try:
+        mtime = ENDPOINTS_FILE.stat().st_mtime
+    except OSError:
+        mtime = None
+    
+    if mtime == _endpoints_mtime and _endpoints:
+        return _endpoints
+    
+    if mtime is None:
+        api_key = _load_api_key()
+        _endpoints = [_Endpoint("openrouter", OPENROUTER_URL, api_key)] if api_key else []
+    else:
+        try:
+            _endpoints = _read_endpoints_file()
+        except Exception as e:
+            # Keep serving with the previous pool until the file is fixed
+            print(f"Warning: Could not load LLM endpoints from {ENDPOINTS_FILE}: {e}")
+    _endpoints_mtime = mtime
+    return _endpoints
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors and failed connections are worth retrying elsewhere."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.is_server_error
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError))
+
+
+def _warn_missing_api_key() -> None:
+    print("Warning: OPENROUTER_API_KEY not set or contains placeholder value. Falling back to OCR.")
+    print("To get an API key, visit: https://openrouter.ai/")
+    print("Set it in .env file as: OPENROUTER_API_KEY=sk-or-v1-your-actual-key")
+
+
+def _encode_image(image: Path | bytes) -> bytes | None:
+    """Downscale to the model's native resolution and return the image as base64 JPEG.
+
+    Returns None for blank pages, which don't need to be sent at all.
+    """
+    img = _open_image(image)
+    if img.format == 'JPEG':
+        # Decode at the OCR path's scale so both make the same blank-page decision
+        img.draft('RGB', OCR_DRAFT_SIZE)
+    # Before thumbnail(): downscaling washes thin strokes out to light grey
+    if _is_blank(img):
+        return None
+    img = ImageOps.exif_transpose(img)
+    img.thumbnail((LLM_MAX_IMAGE_SIDE, LLM_MAX_IMAGE_SIDE), Image.Resampling.LANCZOS)
+    buf = io.BytesIO()
+    img.convert('RGB').save(buf, 'JPEG', quality=LLM_JPEG_QUALITY, optimize=True)
+    return base64.b64encode(buf.getbuffer())
+
+
+def _image_part(base64_image: bytes) -> dict:
+    # The base64 bytes are spliced into the request body as-is by _request_body
+    return {
+        "type": "image_url",
+        "image_url": {
+            "url": base64_image
+        }
     }
+
+
+def _request_body(payload: dict) -> list:
+    """Serialize a chat payload into byte segments without copying the base64 image data.
+
+    Images (the bytes values left by _image_part) are serialized as a marker,
+    and the JSON is split around the markers so each image's bytes become a
+    segment of their own instead of being copied into one multi-MB string.
+    """
+    images = []
     
+    def mark_image(obj):
+        if isinstance(obj, bytes):
+            images.append(obj)
+            return IMAGE_URL_MARKER
+        raise TypeError
+    
+    parts = orjson.dumps(payload, default=mark_image).split(f'"{IMAGE_URL_MARKER}"'.encode())
+    body = [parts[0]]
+    for image, part in zip(images, parts[1:]):
+        body.extend((b'"data:image/jpeg;base64,', image, b'"', part))
+    return body
+
+
+async def _stream(segments: list):
+    for segment in segments:
+        yield segment
+
+
+async def _chat_completion(content: list, max_tokens: int = 2000) -> str:
+    """Send one user message to the least busy endpoint and return the reply text.
+
+    Retryable failures are retried up to LLM_MAX_ATTEMPTS times with
+    exponential backoff, each time on a different endpoint when one is available.
+    """
+    failed = None
+    for attempt in range(LLM_MAX_ATTEMPTS):
+        endpoints = _get_endpoints()
+        candidates = [e for e in endpoints if e is not failed] or endpoints
+        endpoint = min(candidates, key=lambda e: e.in_flight)
+        
+        endpoint.in_flight += 1
+        try:
+            async with endpoint.semaphore:
+                return await _post_chat_completion(endpoint, content, max_tokens)
+        except Exception as e:
+            if not _is_retryable(e) or attempt == LLM_MAX_ATTEMPTS - 1:
+                raise
+            print(f"LLM endpoint '{endpoint.name}' failed: {e}. Retrying on another endpoint.")
+            failed = endpoint
+        finally:
+            endpoint.in_flight -= 1
+        await asyncio.sleep(LLM_RETRY_BACKOFF * 2 ** attempt)
+
+
+async def _post_chat_completion(endpoint: _Endpoint, content: list, max_tokens: int) -> str:
     payload = {
-        "model": "qwen/qwen-2-vl-72b-instruct",
+        "model": endpoint.model,
         "messages": [
             {
                 "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Please analyze this image and extract all text content into well-formatted Markdown. The document appears to be in {lang_context}. Preserve the original structure, headings, and formatting. Include all visible text, numbers, and maintain the document's hierarchy. Be thorough and accurate."
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{base64_image}"
-                        }
-                    }
-                ]
+                "content": content
             }
         ],
-        "max_tokens": 2000,
+        "max_tokens": max_tokens,
         "temperature": 0.1  # Low temperature for more consistent, accurate text extraction
     }
     
+    body = _request_body(payload)
+    # An explicit Content-Length keeps httpx from chunking the streamed body
+    headers = {**endpoint.headers, "Content-Length": str(sum(map(len, body)))}
+    response = await _get_http_client().post(endpoint.url, headers=headers, content=_stream(body))
+    response.raise_for_status()
+    result = orjson.loads(response.content)
+    
+    if 'choices' not in result or len(result['choices']) == 0:
+        raise Exception(f"Unexpected API response: {result}")
+    
+    return result['choices'][0]['message']['content']
+
+
+async def llm_to_markdown(image: Path | bytes, lang: str, digest: str | None = None) -> str:
+    """Use Qwen2.5-VL-72B vision model via OpenRouter to parse image content to markdown with better accuracy than OCR.
+
+    ``image`` is either a path to an image file or the raw bytes of one.
+    """
+    if not httpx:
+        raise SystemExit("httpx library required for LLM parsing. Install with: pip install 'httpx[http2]'")
+    
+    key = _cache_key(image, digest, "llm", lang)
+    [cached] = await _cache_get_many([key])
+    if cached is not None:
+        return cached
+    
+    if not _get_endpoints():
+        _warn_missing_api_key()
+        return await ocr_to_markdown_async(image, lang, digest)
+    
+    # Decoding and resizing is CPU-bound; keep it off the event loop
+    base64_image = await asyncio.to_thread(_encode_image, image)
+    if base64_image is None:
+        return "\n"
+    
+    content = [
+        {
+            "type": "text",
+            "text": f"Please analyze this image and extract all text content into well-formatted Markdown. The document appears to be in {_lang_context(lang)}. Preserve the original structure, headings, and formatting. Include all visible text, numbers, and maintain the document's hierarchy. Be thorough and accurate."
+        },
+        _image_part(base64_image)
+    ]
+    
     try:
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload, timeout=60)
-        response.raise_for_status()
-        result = response.json()
-        
-        if 'choices' not in result or len(result['choices']) == 0:
-            raise Exception(f"Unexpected API response: {result}")
-            
-        return result['choices'][0]['message']['content'].strip() + "\n"
-    except requests.exceptions.Timeout:
+        md = (await _chat_completion(content)).strip() + "\n"
+        await _cache_set_many([key], [md])
+        return md
+    except httpx.TimeoutException:
         print("LLM parsing timed out. Falling back to OCR.")
-        return ocr_to_markdown(image_path, lang)
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"LLM parsing failed with network error: {e}. Falling back to OCR.")
-        return ocr_to_markdown(image_path, lang)
     except Exception as e:
         print(f"LLM parsing failed: {e}. Falling back to OCR.")
-        return ocr_to_markdown(image_path, lang)
+    return await ocr_to_markdown_async(image, lang, digest)
+
 
+async def llm_to_markdown_batch(images: list, lang: str, digests: list | None = None) -> list:
+    """Parse several pages with one vision-model call per group of up to LLM_BATCH_SIZE images.
 
-def ocr_to_markdown(image_path: Path, lang: str) -> str:
-    img = Image.open(image_path)
-    # light preprocessing: grayscale and auto-contrast
-    img = ImageOps.grayscale(img)
-    img = ImageOps.autocontrast(img)
+    Takes image paths or raw image bytes (and optionally their content digests);
+    returns one markdown string per image, in order. Cached and blank pages are not sent.
+    """
+    digests = digests or [None] * len(images)
+    keys = [_cache_key(image, digest, "llm", lang) for image, digest in zip(images, digests)]
+    results = await _cache_get_many(keys)
+    
+    pending = [i for i, md in enumerate(results) if md is None]
+    encoded = dict(zip(pending, await asyncio.gather(*(asyncio.to_thread(_encode_image, images[i]) for i in pending))))
+    for i in pending:
+        if encoded[i] is None:
+            results[i] = "\n"
+    pending = [i for i in pending if encoded[i] is not None]
+    
+    groups = [pending[i:i + LLM_BATCH_SIZE] for i in range(0, len(pending), LLM_BATCH_SIZE)]
+    group_results = await asyncio.gather(*(
+        _llm_batch_group(
+            [images[i] for i in group], [encoded[i] for i in group],
+            [digests[i] for i in group], [keys[i] for i in group], lang
+        )
+        for group in groups
+    ))
+    for group, mds in zip(groups, group_results):
+        for i, md in zip(group, mds):
+            results[i] = md
+    return results
+
+
+async def _llm_per_image(images: list, digests: list, lang: str) -> list:
+    return list(await asyncio.gather(*(llm_to_markdown(image, lang, digest) for image, digest in zip(images, digests))))
+
+
+async def _ocr_per_image(images: list, digests: list, lang: str) -> list:
+    return list(await asyncio.gather(*(ocr_to_markdown_async(image, lang, digest) for image, digest in zip(images, digests))))
+
+
+class _PageCountError(Exception):
+    """A batched LLM reply did not split into one section per image."""
+
+
+async def _llm_batch_group(images: list, encoded: list, digests: list, keys: list, lang: str) -> list:
+    if not httpx:
+        raise SystemExit("httpx library required for LLM parsing. Install with: pip install 'httpx[http2]'")
+    
+    if len(images) == 1 or not _get_endpoints():
+        return await _llm_per_image(images, digests, lang)
+    
+    content = [
+        {
+            "type": "text",
+            "text": f"Please analyze these {len(images)} images, one document page each, and extract all text content of every page into well-formatted Markdown. The document appears to be in {_lang_context(lang)}. Preserve the original structure, headings, and formatting. Include all visible text, numbers, and maintain the document's hierarchy. Be thorough and accurate. Start the output for page i (counting from 1, in the order the images are given) with a line containing only `=== PAGE i ===`."
+        }
+    ]
+    content.extend(_image_part(base64_image) for base64_image in encoded)
+    
+    try:
+        reply = await _chat_completion(content, max_tokens=2000 * len(images))
+        pages = PAGE_DELIMITER.split(reply)[1:]
+        if len(pages) != len(images):
+            raise _PageCountError(f"expected {len(images)} pages, got {len(pages)}")
+        mds = [page.strip() + "\n" for page in pages]
+        await _cache_set_many(keys, mds)
+        return mds
+    except httpx.HTTPStatusError as e:
+        if e.response.is_client_error and e.response.status_code != 429:
+            print(f"Batched LLM parsing rejected: {e}. Retrying page by page.")
+            return await _llm_per_image(images, digests, lang)
+        print(f"Batched LLM parsing failed with network error: {e}. Falling back to OCR.")
+    except httpx.TimeoutException:
+        print("Batched LLM parsing timed out. Falling back to OCR.")
+    except httpx.HTTPError as e:
+        print(f"Batched LLM parsing failed with network error: {e}. Falling back to OCR.")
+    except _PageCountError as e:
+        print(f"Batched LLM response could not be split into pages: {e}. Retrying page by page.")
+        return await _llm_per_image(images, digests, lang)
+    except Exception as e:
+        print(f"Batched LLM parsing failed: {e}. Falling back to OCR.")
+    return await _ocr_per_image(images, digests, lang)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_api(lang: str):
+    """Return a cached (PyTessBaseAPI, lock) pair for the given language.
+
+    Initializing the API loads the language's .traineddata, so it is done once
+    per worker and language instead of on every request. The underlying C++
+    handle is not thread-safe, so every use must hold the paired lock.
+    """
+    return tesserocr.PyTessBaseAPI(lang=lang), threading.Lock()
+
+
+def _image_to_string(img, lang: str) -> str:
+    api, lock = _get_api(lang)
+    with lock:
+        api.SetImage(img)
+        return api.GetUTF8Text()
+
+
+def preload_languages(langs) -> None:
+    """Initialize Tesseract for each language so the first request doesn't pay for it."""
+    for lang in langs:
+        try:
+            _get_api(lang)
+        except RuntimeError as e:
+            print(f"Warning: Could not preload Tesseract language '{lang}': {e}")
+
+
+def _open_image(image: Path | bytes):
+    return Image.open(io.BytesIO(image) if isinstance(image, bytes) else image)
+
+
+def _levels(hist: list) -> tuple:
+    """Darkest and lightest level present in a grayscale histogram."""
+    levels = [value for value, count in enumerate(hist) if count]
+    return levels[0], levels[-1]
+
+
+def _is_blank(img, hist: list | None = None) -> bool:
+    """Whether a page has (almost) no dark pixels after auto-contrast.
+
+    Works on the full-resolution histogram: downsampling first would average thin
+    strokes into light grey and make pages of small print look blank.
+    """
+    hist = hist or img.convert('L').histogram()
+    lo, hi = _levels(hist)
+    # Same stretch ImageOps.autocontrast applies, without building the image
+    dark_level = lo + (hi - lo) * BLANK_PAGE_DARK_LEVEL // 255 if hi > lo else 0
+    return sum(hist[:dark_level]) < BLANK_PAGE_MAX_DARK_PIXELS
+
+
+def _load_grayscale(image: Path | bytes):
+    img = _open_image(image)
+    if img.format == 'JPEG':
+        # Have libjpeg emit grayscale, downsampled in the DCT domain, instead of full-size RGB
+        img.draft('L', OCR_DRAFT_SIZE)
+    return img.convert('L')
+
+
+def _size_bucket(size: tuple) -> str:
+    longest = max(size)
+    if longest < OCR_SMALL_SIDE:
+        return "small"
+    return "large" if longest >= OCR_LARGE_SIDE else "medium"
+
+
+def _is_clean_scan(img, hist: list) -> bool:
+    """Whether a grayscale page already spans (almost) the full tonal range at print resolution.
+
+    Autocontrast barely changes such pages. Images that record a DPI below
+    OCR_PRINT_DPI (e.g. phone photos tagged 72 DPI) never count as clean.
+    """
+    lo, hi = _levels(hist)
+    # PNG stores DPI as pixels per metre, so 300 DPI reads back as 299.9994
+    dpi = img.info.get('dpi')
+    return hi - lo >= OCR_CLEAN_SPREAD and (not dpi or round(min(dpi)) >= OCR_PRINT_DPI)
+
+
+def _script(lang: str) -> str:
+    codes = set(lang.split("+"))
+    if codes <= LATIN_LANGS:
+        return "latin"
+    return "cjk" if codes & CJK_LANGS else "other"
+
+
+def _upscale(img):
+    return img.resize((img.width * OCR_UPSCALE, img.height * OCR_UPSCALE), Image.Resampling.LANCZOS)
+
+
+# Keyed on script/bucket/clean rather than the client's language string, so it stays small
+@functools.lru_cache(maxsize=None)
+def _pipeline(script: str, size_bucket: str, clean: bool):
+    """Return the preprocessing applied to grayscale pages of this script, size bucket and quality.
+
+    The steps are chosen once per combination rather than re-decided for every page.
+    """
+    steps = []
+    if size_bucket == "small" or (script == "cjk" and size_bucket == "medium"):
+        steps.append(_upscale)
+    if not (script == "latin" and clean):
+        steps.append(ImageOps.autocontrast)
+    return lambda img: functools.reduce(lambda acc, step: step(acc), steps, img)
+
+
+def normalize_markdown(text: str) -> str:
+    """Basic Markdown normalization: strip trailing whitespace and collapse empty-line runs."""
+    # splitlines/rstrip/join and the regex all run in C, with no per-line Python loop
+    text = "\n".join(map(str.rstrip, text.splitlines()))
+    return BLANK_LINE_RUNS.sub("\n\n", text).strip() + "\n"
+
+
+def ocr_to_markdown(image: Path | bytes, lang: str, digest: str | None = None) -> str:
+    """OCR an image file path or raw image bytes with Tesseract into markdown."""
+    key = _cache_key(image, digest, "ocr", lang)
+    if key:
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+    
+    img = _load_grayscale(image)
+    hist = img.histogram()
+    if _is_blank(img, hist):
+        return "\n"
+    img = _pipeline(_script(lang or "eng"), _size_bucket(img.size), _is_clean_scan(img, hist))(img)
     
     # Try OCR with specified language, fallback to English if language pack missing
     try:
-        text = str(pytesseract.image_to_string(img, lang=lang or "eng"))
-    except pytesseract.TesseractError as e:
-        if "Failed loading language" in str(e):
+        text = _image_to_string(img, lang or "eng")
+    except RuntimeError as e:
+        if "Failed to init API" in str(e):
             print(f"Warning: Language '{lang}' not available. Falling back to English.")
             print(f"To install language packs on macOS: brew install tesseract-lang")
-            text = str(pytesseract.image_to_string(img, lang="eng"))
+            text = _image_to_string(img, "eng")
         else:
             raise e
-    # Basic Markdown normalization
-    lines = [ln.rstrip() for ln in text.splitlines()]
-    # Collapse multiple empty lines
-    md_lines = []
-    empty = 0
-    for ln in lines:
-        if ln.strip():
-            empty = 0
-            md_lines.append(ln)
-        else:
-            empty += 1
-            if empty < 2:
-                md_lines.append("")
-    md = "\n".join(md_lines).strip() + "\n"
+    md = normalize_markdown(text)
+    if key:
+        _cache_set(key, md)
     return md
 
 
+_ocr_executor = None
+_ocr_preload_langs = ("eng",)
+
+
+def get_ocr_executor() -> concurrent.futures.ProcessPoolExecutor:
+    """Return the OCR process pool, creating it on first use.
+
+    Workers are spawned rather than forked, since the parent is a threaded
+    event-loop process, and each one initializes its own Tesseract handle.
+    """
+    global _ocr_executor
+    if _ocr_executor is None:
+        _ocr_executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=OCR_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=preload_languages,
+            initargs=(_ocr_preload_langs,),
+        )
+    return _ocr_executor
+
+
+async def start_ocr_pool(langs=None) -> None:
+    """Spawn every OCR worker up front so the first requests don't pay for process start-up.
+
+    Each worker loads Tesseract for all of ``langs`` (default: English) as it
+    starts, so no request stalls on loading a language model.
+    """
+    global _ocr_preload_langs
+    if langs:
+        _ocr_preload_langs = tuple(langs)
+    loop = asyncio.get_running_loop()
+    executor = get_ocr_executor()
+    # Submitted together, each task needs its own worker, so all of them get started
+    await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(OCR_WORKERS)))
+
+
+def shutdown_ocr_pool() -> None:
+    global _ocr_executor
+    if _ocr_executor is not None:
+        _ocr_executor.shutdown(wait=False, cancel_futures=True)
+        _ocr_executor = None
+
+
+async def ocr_to_markdown_async(image: Path | bytes, lang: str, digest: str | None = None) -> str:
+    """Run ocr_to_markdown in the OCR process pool (or a thread, if no pool was started) without blocking the event loop."""
+    if _get_result_cache() is not None:
+        # Answer cache hits here rather than shipping the image to a worker
+        digest = digest or await asyncio.to_thread(content_digest, image)
+        [cached] = await _cache_get_many([_cache_key(image, digest, "ocr", lang)])
+        if cached is not None:
+            return cached
+    if _ocr_executor is None:
+        # No pool was started (e.g. the CLI's LLM fallback): spawning one for a
+        # single image costs far more than the OCR itself
+        return await asyncio.to_thread(ocr_to_markdown, image, lang, digest)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_ocr_executor, ocr_to_markdown, image, lang, digest)
+
+
+# GPU batches (and model loading) run one at a time on this thread; queued requests
+# wait here rather than each holding a thread of the default executor
+_gpu_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="gpu-ocr")
+
+
+@functools.cache
+def _get_gpu_predictors():
+    """Return Surya's (detection, recognition) predictors, or None if GPU OCR is unavailable.
+
+    Loaded once per process. Written against surya-ocr 0.13; unless overridden in
+    the environment, Surya compiles the recognition model's encoder and decoder
+    with a static KV cache, so the first batches after loading also pay for
+    compilation.
+    """
+    # Surya reads its settings when first imported
+    os.environ.setdefault("COMPILE_RECOGNITION", "true")
+    # Imported here rather than at module level: torch is heavy, and every
+    # spawned Tesseract worker imports this module too
+    try:
+        import torch
+        from surya.detection import DetectionPredictor
+        from surya.recognition import RecognitionPredictor
+    except Exception:
+        return None
+    if not torch.cuda.is_available():
+        return None
+    try:
+        return DetectionPredictor(), RecognitionPredictor()
+    except Exception as e:
+        print(f"Warning: Could not load Surya models for GPU OCR: {e}")
+        return None
+
+
+def _warn_gpu_unavailable() -> None:
+    print("Warning: GPU OCR needs surya-ocr and a CUDA GPU. Falling back to Tesseract.")
+    print("Install with: pip install 'surya-ocr~=0.13.1'")
+
+
+def _surya_langs(lang: str) -> list:
+    # Unknown languages fall back to English, as with Tesseract
+    return [SURYA_LANGS.get(code, "en") for code in (lang or "eng").split("+")]
+
+
+def ocr_to_markdown_gpu(images: list, lang: str, digests: list | None = None) -> list:
+    """OCR several image paths or raw image bytes in one Surya batch on the GPU.
+
+    Returns one markdown string per image, in order. Without Surya or a CUDA GPU
+    the images are OCRed with Tesseract instead.
+    """
+    digests = digests or [None] * len(images)
+    predictors = _get_gpu_predictors()
+    if predictors is None:
+        _warn_gpu_unavailable()
+        return [ocr_to_markdown(image, lang, digest) for image, digest in zip(images, digests)]
+    
+    keys = [_cache_key(image, digest, "gpu", lang) for image, digest in zip(images, digests)]
+    results = [_cache_get(key) if key else None for key in keys]
+    
+    pending, pages = [], []
+    for i, md in enumerate(results):
+        if md is not None:
+            continue
+        img = ImageOps.exif_transpose(_open_image(images[i])).convert('RGB')
+        if _is_blank(img):
+            results[i] = "\n"
+            continue
+        pending.append(i)
+        pages.append(img)
+    
+    if pages:
+        detection, recognition = predictors
+        # Surya splits the batch into model-sized batches itself
+        predictions = recognition(pages, [_surya_langs(lang)] * len(pages), det_predictor=detection)
+        for i, prediction in zip(pending, predictions):
+            md = normalize_markdown("\n".join(line.text for line in prediction.text_lines))
+            if keys[i]:
+                _cache_set(keys[i], md)
+            results[i] = md
+    return results
+
+
+async def start_gpu_ocr() -> bool:
+    """Load and compile the GPU OCR models up front, if Surya and a CUDA GPU are available."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_gpu_executor, _get_gpu_predictors) is not None
+
+
+async def ocr_to_markdown_gpu_async(images: list, lang: str, digests: list | None = None) -> list:
+    """Run ocr_to_markdown_gpu without blocking the event loop.
+
+    Falls back to the Tesseract process pool when GPU OCR is unavailable or fails.
+    """
+    digests = digests or [None] * len(images)
+    if not await start_gpu_ocr():
+        _warn_gpu_unavailable()
+        return await _ocr_per_image(images, digests, lang)
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_gpu_executor, ocr_to_markdown_gpu, images, lang, digests)
+    except Exception as e:
+        print(f"GPU OCR failed: {e}. Falling back to Tesseract.")
+        return await _ocr_per_image(images, digests, lang)
+
+
 def main():
     ap = argparse.ArgumentParser(description="OCR an image and write Markdown")
     ap.add_argument("image", type=Path, help="Path to the image file")
     ap.add_argument("--lang", default="eng", help="Tesseract language(s), e.g., 'eng+hrv'")
     ap.add_argument("--out", type=Path, default=None, help="Output Markdown file path")
-    ap.add_argument("--method", choices=["ocr", "llm"], default="ocr", help="Parsing method: ocr (tesseract) or llm (vision model)")
+    ap.add_argument("--method", choices=["ocr", "llm", "gpu"], default="ocr", help="Parsing method: ocr (tesseract), llm (vision model) or gpu (surya)")
     
     try:
         args = ap.parse_args()
@@ -174,7 +887,9 @@ def main():
         raise SystemExit(f"Image not found: {args.image}")
 
     if args.method == "llm":
-        md = llm_to_markdown(args.image, args.lang)
+        md = asyncio.run(llm_to_markdown(args.image, args.lang))
+    elif args.method == "gpu":
+        md = ocr_to_markdown_gpu([args.image], args.lang)[0]
     else:
         md = ocr_to_markdown(args.image, args.lang)
         
@@ -0,0 +1,35 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+A4_300_DPI = (2480, 3508)
+
+
+@pytest.fixture
+def make_page():
+    """Factory for encoded test pages.
+
+    With ``lines=None`` the page is covered in lines of small print; otherwise
+    it holds just the given lines as 12pt (50px at 300 DPI) text near the
+    bottom, and an empty list gives a blank page.
+    """
+    def make(size=A4_300_DPI, fmt='PNG', lines=None, background=255, ink=0, dpi=None):
+        img = Image.new('RGB', size, (background,) * 3)
+        draw = ImageDraw.Draw(img)
+        if lines is None:
+            for y in range(100, size[1] - 100, 40):
+                draw.text((100, y), "The quick brown fox jumps over the lazy dog. " * 10, fill=(ink,) * 3)
+        else:
+            font = ImageFont.load_default(size=50)
+            for i, line in enumerate(lines):
+                draw.text((150, size[1] - 500 + 80 * i), line, font=font, fill=(ink,) * 3)
+        buf = io.BytesIO()
+        img.save(buf, fmt, **({'dpi': dpi} if dpi else {}))
+        return buf.getvalue()
+
+    return make
@@ -0,0 +1,24 @@
+from scripts.ocr_to_md import _encode_image, _is_blank, _load_grayscale
+
+
+def test_full_page_of_small_print_is_not_blank(make_page):
+    for size in [(2480, 3508), (3000, 2000)]:
+        for fmt in ['PNG', 'JPEG']:
+            page = make_page(size, fmt)
+            assert not _is_blank(_load_grayscale(page)), (size, fmt)
+            assert _encode_image(page) is not None, (size, fmt)
+
+
+def test_blank_page_is_skipped(make_page):
+    for fmt in ['PNG', 'JPEG']:
+        page = make_page(fmt=fmt, lines=[])
+        assert _is_blank(_load_grayscale(page))
+        assert _encode_image(page) is None
+
+
+def test_page_with_a_few_lines_is_not_blank(make_page):
+    for lines in [["Total due: 1,234.56 EUR " * 3], ["Signed: ____________________", "Date: 2024-01-31"], ["Page 2"]]:
+        for fmt in ['PNG', 'JPEG']:
+            page = make_page(fmt=fmt, lines=lines)
+            assert not _is_blank(_load_grayscale(page)), (lines, fmt)
+            assert _encode_image(page) is not None, (lines, fmt)
@@ -0,0 +1,50 @@
+from PIL import Image
+
+from scripts.ocr_to_md import _is_clean_scan, _load_grayscale, _pipeline, _script
+
+
+def _is_clean(page):
+    img = _load_grayscale(page)
+    return _is_clean_scan(img, img.histogram())
+
+
+def _low_contrast(size):
+    """A grayscale gradient spanning only levels 100-163."""
+    return Image.linear_gradient('L').resize(size).point(lambda v: 100 + v // 4)
+
+
+def _run(script, size_bucket, clean, size=(400, 300)):
+    """Output size of the pipeline, and whether it stretched the contrast."""
+    out = _pipeline(script, size_bucket, clean)(_low_contrast(size))
+    lo, hi = out.getextrema()
+    return out.size, lo == 0 and hi >= 250
+
+
+def test_clean_print_scan_is_detected(make_page):
+    assert _is_clean(make_page(dpi=(300, 300)))
+
+
+def test_phone_photos_are_not_clean_scans(make_page):
+    assert not _is_clean(make_page((4032, 3024), 'JPEG', dpi=(72, 72)))
+    assert not _is_clean(make_page((4032, 3024), 'JPEG', background=200, ink=90))
+
+
+def test_clean_latin_scans_skip_autocontrast():
+    assert _run("latin", "large", True) == ((400, 300), False)
+    assert _run("latin", "large", False) == ((400, 300), True)
+    # Only Latin-script pages skip it
+    assert _run("cjk", "large", True) == ((400, 300), True)
+
+
+def test_small_and_mid_size_cjk_pages_are_upscaled():
+    assert _run("latin", "small", False)[0] == (800, 600)
+    assert _run("cjk", "medium", False) == ((800, 600), True)
+    assert _run("latin", "medium", False)[0] == (400, 300)
+    assert _run("other", "large", False)[0] == (400, 300)
+
+
+def test_languages_map_to_a_few_scripts():
+    assert _script("eng") == _script("eng+hrv") == "latin"
+    assert _script("jpn") == _script("eng+jpn") == "cjk"
+    # Unknown languages share one pipeline rather than growing the cache
+    assert _script("xx1") == _script("xx2") == "other"
@@ -12,19 +12,32 @@ export interface UploadResponse {
 
 export interface ProcessRequest {
   file_id: string
-  method: 'ocr' | 'llm'
+  method: 'ocr' | 'llm' | 'gpu'
   language: string
 }
 
+export interface ProcessedData {
+  raw_text: string
+  lines: string[]
+  method_used: string
+  language: string
+  file_id: string | null
+}
+
 export interface ProcessResponse {
   status: string
-  data: {
-    raw_text: string
-    lines: string[]
-    method_used: string
-    language: string
-    file_id: string
-  }
+  data: ProcessedData
+}
+
+export interface BatchProcessRequest {
+  file_ids: string[]
+  method: 'ocr' | 'llm' | 'gpu'
+  language: string
+}
+
+export interface BatchProcessResponse {
+  status: string
+  data: ProcessedData[]
 }
 
 export interface Language {
@@ -101,6 +114,25 @@ class APIClient {
     return await response.json()
   }
 
+  async ocrFile(file: File, method: ProcessRequest['method'], language: string): Promise<ProcessResponse> {
+    const formData = new FormData()
+    formData.append('file', file)
+    formData.append('method', method)
+    formData.append('language', language)
+
+    const response = await fetch(`${this.baseURL}/api/ocr`, {
+      method: 'POST',
+      body: formData,
+    })
+
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}))
+      throw new Error(errorData.error || `Processing failed: ${response.statusText}`)
+    }
+
+    return await response.json()
+  }
+
   async processFile(request: ProcessRequest): Promise<ProcessResponse> {
     return this.request('/api/process', {
       method: 'POST',
@@ -108,6 +140,13 @@ class APIClient {
     })
   }
 
+  async processBatch(request: BatchProcessRequest): Promise<BatchProcessResponse> {
+    return this.request('/api/process_batch', {
+      method: 'POST',
+      body: JSON.stringify(request),
+    })
+  }
+
   async getAvailableLanguages(): Promise<{ languages: Language[] }> {
     return this.request('/api/languages')
   }
@@ -118,6 +157,9 @@ export const apiClient = new APIClient()
 
 // Export individual functions for easier use
 export const uploadFile = (file: File) => apiClient.uploadFile(file)
+export const ocrFile = (file: File, method: ProcessRequest['method'], language: string) =>
+  apiClient.ocrFile(file, method, language)
 export const processFile = (request: ProcessRequest) => apiClient.processFile(request)
+export const processBatch = (request: BatchProcessRequest) => apiClient.processBatch(request)
 export const getAvailableLanguages = () => apiClient.getAvailableLanguages()
 export const healthCheck = () => apiClient.healthCheck()
\ No newline at end of file
@@ -1,5 +1,5 @@
 import React from 'react'
-import { uploadFile, processFile, getAvailableLanguages, Language } from '../../api/client'
+import { ocrFile, getAvailableLanguages, Language } from '../../api/client'
 import './DocumentPreview.css'
 
 interface DocumentPreviewProps {
@@ -8,7 +8,6 @@ interface DocumentPreviewProps {
 }
 
 interface ProcessingState {
-  uploading: boolean
   processing: boolean
   error: string | null
 }
@@ -16,14 +15,12 @@ interface ProcessingState {
 const DocumentPreview: React.FC<DocumentPreviewProps> = ({ file, onProcessComplete }) => {
   const [previewUrl, setPreviewUrl] = React.useState<string>('')
   const [state, setState] = React.useState<ProcessingState>({
-    uploading: false,
     processing: false,
     error: null
   })
-  const [selectedMethod, setSelectedMethod] = React.useState<'ocr' | 'llm'>('ocr')
+  const [selectedMethod, setSelectedMethod] = React.useState<'ocr' | 'llm' | 'gpu'>('ocr')
   const [selectedLanguage, setSelectedLanguage] = React.useState<string>('eng')
   const [availableLanguages, setAvailableLanguages] = React.useState<Language[]>([])
-  const [fileId, setFileId] = React.useState<string | null>(null)
 
   React.useEffect(() => {
     const objectUrl = URL.createObjectURL(file)
@@ -41,24 +38,15 @@ const DocumentPreview: React.FC<DocumentPreviewProps> = ({ file, onProcessComple
 
   const handleProcess = async () => {
     try {
-      setState(prev => ({ ...prev, uploading: true, error: null }))
+      setState(prev => ({ ...prev, processing: true, error: null }))
       
-      // Step 1: Upload file
-      const uploadResponse = await uploadFile(file)
-      setFileId(uploadResponse.file_id)
-      
-      setState(prev => ({ ...prev, uploading: false, processing: true }))
-      
-      // Step 2: Process file
-      const processResponse = await processFile({
-        file_id: uploadResponse.file_id,
-        method: selectedMethod,
-        language: selectedLanguage
-      })
+      // Upload and process in one request, so it can't land on a server
+      // worker that doesn't hold the upload
+      const processResponse = await ocrFile(file, selectedMethod, selectedLanguage)
       
       // Transform API response to match expected format
       const results = {
-        id: uploadResponse.file_id,
+        id: crypto.randomUUID(),
         fileName: file.name,
         method: processResponse.data.method_used,
         language: processResponse.data.language,
@@ -74,7 +62,6 @@ const DocumentPreview: React.FC<DocumentPreviewProps> = ({ file, onProcessComple
       console.error('Processing failed:', error)
       setState(prev => ({
         ...prev,
-        uploading: false,
         processing: false,
         error: error instanceof Error ? error.message : 'Processing failed'
       }))
@@ -135,11 +122,12 @@ const DocumentPreview: React.FC<DocumentPreviewProps> = ({ file, onProcessComple
               <label>Method:</label>
               <select 
                 value={selectedMethod} 
-                onChange={(e) => setSelectedMethod(e.target.value as 'ocr' | 'llm')}
-                disabled={state.uploading || state.processing}
+                onChange={(e) => setSelectedMethod(e.target.value as 'ocr' | 'llm' | 'gpu')}
+                disabled={state.processing}
               >
                 <option value="ocr">OCR (Tesseract)</option>
                 <option value="llm">LLM (Vision Model)</option>
+                <option value="gpu">OCR (GPU)</option>
               </select>
             </div>
             
@@ -148,7 +136,7 @@ const DocumentPreview: React.FC<DocumentPreviewProps> = ({ file, onProcessComple
               <select 
                 value={selectedLanguage} 
                 onChange={(e) => setSelectedLanguage(e.target.value)}
-                disabled={state.uploading || state.processing}
+                disabled={state.processing}
               >
                 {availableLanguages.map(lang => (
                   <option key={lang.code} value={lang.code}>
@@ -167,19 +155,16 @@ const DocumentPreview: React.FC<DocumentPreviewProps> = ({ file, onProcessComple
           
           <button 
             onClick={handleProcess}
-            disabled={state.uploading || state.processing}
+            disabled={state.processing}
             className="process-button"
           >
-            {state.uploading ? 'Uploading...' : 
-             state.processing ? 'Processing...' : 
-             'Process Document'}
+            {state.processing ? 'Processing...' : 'Process Document'}
           </button>
           
           <div className="file-info">
             <p><strong>File name:</strong> {file.name}</p>
             <p><strong>Size:</strong> {(file.size / 1024).toFixed(2)} KB</p>
             <p><strong>Type:</strong> {file.type}</p>
-            {fileId && <p><strong>File ID:</strong> {fileId}</p>}
           </div>
         </div>
       </div>